@@ -0,0 +1,28 @@
+# _jit.py
+"""
+Optional Numba support.
+
+Re-exports `njit` / `prange` / `get_num_threads` / `set_num_threads`
+from Numba when it is installed. Without Numba, `njit` becomes a no-op
+decorator, `prange` is plain `range` and there is a single thread, so the
+decorated kernels still run as ordinary Python/NumPy code.
+"""
+
+try:
+    from numba import get_num_threads, njit, prange, set_num_threads
+    HAVE_NUMBA = True
+except ImportError:  # numba is optional
+    HAVE_NUMBA = False
+    prange = range
+
+    def get_num_threads():
+        return 1
+
+    def set_num_threads(n):
+        pass
+
+    def njit(*args, **kwargs):
+        # Supports both @njit and @njit(cache=True, ...)
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
@@ -0,0 +1,174 @@
+# _backtest_numba.py
+"""
+Numba kernels for the backtesting module (optional dependency).
+
+Imported by backtesting.py only when Numba is installed.
+"""
+from functools import lru_cache
+
+import numpy as np
+from numba import get_num_threads, njit, prange
+
+
+# ============================================================
+# 1) Rolling Historical VaR & ES — incremental sorted window
+# ============================================================
+
+@njit(cache=True)
+def _slide(buf, old, new):
+    """
+    Replace `old` by `new` in the sorted buffer, keeping it sorted: a
+    binary search for each plus one shift of the elements in between.
+    """
+    j = np.searchsorted(buf, old)   # slot of the leaving element
+    p = np.searchsorted(buf, new)   # insert slot of the new one
+
+    if p > j:
+        for m in range(j, p - 1):
+            buf[m] = buf[m + 1]
+        buf[p - 1] = new
+    else:
+        for m in range(j, p, -1):
+            buf[m] = buf[m - 1]
+        buf[p] = new
+
+
+@njit(cache=True)
+def _rolling_chunk(losses, window, k, start, stop, var_out, es_out):
+    """
+    Fill var_out/es_out[start:stop] by sliding one sorted buffer.
+
+    Output i uses the window losses[i:i + window]. Consecutive windows
+    differ by one element, so each step updates the buffer in place
+    instead of sorting afresh.
+    """
+    buf = np.sort(losses[start:start + window])
+    lo = window - k if k > 0 else 0   # k == 0 -> mean of whole window
+
+    for i in range(start, stop):
+        if i > start:
+            _slide(buf, losses[i - 1], losses[i + window - 1])
+
+        var_out[i] = buf[window - k - 1]
+
+        s = 0.0
+        for m in range(lo, window):
+            s += buf[m]
+        es_out[i] = s / (window - lo)
+
+
+@njit(parallel=True, cache=True)
+def _rolling_parallel(losses, window, k, n_chunks):
+    n = losses.shape[0] - window
+    var_out = np.empty(n)
+    es_out = np.empty(n)
+
+    for c in prange(n_chunks):
+        start = c * n // n_chunks
+        stop = (c + 1) * n // n_chunks
+        _rolling_chunk(losses, window, k, start, stop, var_out, es_out)
+
+    return var_out, es_out
+
+
+def _n_chunks(n, window):
+    # Each chunk pays one O(W log W) sort to seed its buffer
+    return max(1, min(get_num_threads(), n // (4 * window)))
+
+
+def rolling_var_es_nb(losses, window, k):
+    """
+    Rolling historical VaR & ES of a loss series.
+
+    losses : 1-D float array of losses (-returns), no NaNs
+    window : rolling window length
+    k      : number of tail observations, floor((1 - conf_level) * window)
+
+    Returns (VaR, ES) arrays of length len(losses) - window. The output is
+    split into independent chunks (one sorted buffer each) run in parallel.
+    """
+    losses = np.ascontiguousarray(losses, dtype=np.float64)
+    n = losses.shape[0] - window
+
+    return _rolling_parallel(losses, window, k, _n_chunks(n, window))
+
+
+# Tail sizes up to this can get a kernel compiled for their (window, k)
+SPECIALIZE_MAX_K = 4
+
+
+@lru_cache(maxsize=16)
+def make_rolling_kernel(window, k, specialize=False):
+    """
+    Rolling VaR/ES kernel for one (window, k) pair: kernel(losses) ->
+    (VaR, ES), same contract as rolling_var_es_nb.
+
+    By default this is the generic, disk-cached rolling_var_es_nb.
+
+    specialize=True (only for k <= SPECIALIZE_MAX_K) bakes window and k in
+    as compile-time constants, so the tail mean is a fixed-length loop LLVM
+    fully unrolls. Closures cannot be disk-cached: every new process pays a
+    full compilation (seconds) for each pair, against a steady-state gain
+    of a few percent, so it only pays off for very long series or many
+    repeated calls within one process.
+    """
+    if not specialize or k > SPECIALIZE_MAX_K:
+        return lambda losses: rolling_var_es_nb(losses, window, k)
+
+    W = window
+    K = k
+    LO = W - K if K > 0 else 0
+    VAR_IDX = W - K - 1
+    INV_N_TAIL = 1.0 / (W - LO)
+
+    @njit
+    def chunk(losses, start, stop, var_out, es_out):
+        buf = np.sort(losses[start:start + W])
+        for i in range(start, stop):
+            if i > start:
+                _slide(buf, losses[i - 1], losses[i + W - 1])
+
+            var_out[i] = buf[VAR_IDX]
+
+            s = 0.0
+            for m in range(LO, W):
+                s += buf[m]
+            es_out[i] = s * INV_N_TAIL
+
+    @njit(parallel=True)
+    def run(losses, n_chunks):
+        n = losses.shape[0] - W
+        var_out = np.empty(n)
+        es_out = np.empty(n)
+        for c in prange(n_chunks):
+            chunk(losses, c * n // n_chunks, (c + 1) * n // n_chunks,
+                  var_out, es_out)
+        return var_out, es_out
+
+    def kernel(losses):
+        losses = np.ascontiguousarray(losses, dtype=np.float64)
+        return run(losses, _n_chunks(losses.shape[0] - W, W))
+
+    return kernel
+
+
+# ============================================================
+# 2) Acerbi–Szekely — fused Z statistics
+# ============================================================
+
+@njit(cache=True)
+def acerbi_szekely_stats_nb(losses, VaR, ES):
+    """
+    One streaming pass over the forecasts for the Acerbi–Szekely Z_t:
+    Z_t = 1{loss_t > VaR_t} * (loss_t - ES_t) / ES_t.
+
+    Returns (sum Z_t, sum Z_t**2); non-violation days contribute zero.
+    """
+    s = 0.0
+    s2 = 0.0
+    for t in range(losses.shape[0]):
+        if losses[t] > VaR[t]:
+            z = (losses[t] - ES[t]) / ES[t]
+            s += z
+            s2 += z * z
+    return s, s2
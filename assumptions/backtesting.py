@@ -1,17 +1,51 @@
 # backtesting.py
+import math
+from functools import lru_cache
+
 import numpy as np
 import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
 from scipy.stats import chi2, norm
 
+try:
+    from _backtest_numba import acerbi_szekely_stats_nb, make_rolling_kernel
+except ImportError:  # numba is optional
+    acerbi_szekely_stats_nb = make_rolling_kernel = None
+
 
 # ============================================================
 # 1) Rolling Historical VaR & ES Forecasts
 # ============================================================
 
+def _rolling_var_es_loop(losses, window, k):
+    """
+    Per-window reference implementation: sorts each window in turn and
+    never materialises the (T - window) x window matrix.
+
+    k : tail size, floor((1 - conf_level) * window)
+    """
+    # Loop invariants: the sorted-window positions implied by k
+    var_idx = window - k - 1
+    es_slice = slice(window - k if k > 0 else 0, window)
+
+    T = len(losses)
+    var_arr = np.empty(T - window)
+    es_arr = np.empty(T - window)
+
+    for t in range(window, T):
+        losses_sorted = np.sort(losses[t - window:t])
+
+        var_arr[t - window] = losses_sorted[var_idx]
+        es_arr[t - window] = losses_sorted[es_slice].mean()
+
+    return var_arr, es_arr
+
+
 def rolling_var_es_forecast(
     returns,
     conf_level=0.99,
     window=250,
+    engine="numpy",
 ):
     """
     Compute rolling historical VaR & ES using a fixed-size window.
@@ -19,33 +53,50 @@ def rolling_var_es_forecast(
     returns   : Series of daily portfolio returns
     conf_level: VaR/ES confidence (e.g. 0.99)
     window    : rolling window length
+    engine    : "numpy"  – vectorised partition over all windows (default)
+                "numba"  – incremental sorted window, JIT-compiled
+                           (requires numba)
+                "python" – per-window loop, lowest memory footprint
     """
     returns = returns.dropna()
     T = len(returns)
 
-    var_list = []
-    es_list = []
-    index_list = []
+    if T <= window:
+        return pd.DataFrame({"VaR": [], "ES": []}, index=returns.index[:0])
 
-    for t in range(window, T):
-        window_data = returns.iloc[t - window:t].values
+    # Losses = -returns
+    losses = -returns.to_numpy(dtype=np.float64)
+
+    k = int(np.floor((1 - conf_level) * window))
+
+    if engine == "numpy":
+        # One row per forecast date t: the window losses[t - window:t]
+        windows = sliding_window_view(losses, window)[:T - window]
 
-        # Losses = -returns
-        losses = -window_data
-        losses_sorted = np.sort(losses)
+        # Partial sort: only the VaR boundary has to land in its sorted slot,
+        # the k largest losses end up (unordered) to its right.
+        part = np.partition(windows, kth=window - k - 1, axis=1)
 
-        k = int(np.floor((1 - conf_level) * window))
+        VaR = part[:, -k - 1]
+        ES = part[:, -k:].mean(axis=1)
 
-        VaR = losses_sorted[-k - 1]
-        ES = losses_sorted[-k:].mean()
+    elif engine == "numba":
+        if make_rolling_kernel is None:
+            raise ImportError("engine='numba' requires the numba package")
+        # Generic disk-cached kernel; see make_rolling_kernel(specialize=True)
+        VaR, ES = make_rolling_kernel(window, k)(losses)
 
-        var_list.append(VaR)
-        es_list.append(ES)
-        index_list.append(returns.index[t])
+    elif engine == "python":
+        VaR, ES = _rolling_var_es_loop(losses, window, k)
+
+    else:
+        raise ValueError(
+            f"engine must be 'numpy', 'numba' or 'python', got {engine!r}"
+        )
 
     df = pd.DataFrame(
-        {"VaR": var_list, "ES": es_list},
-        index=index_list,
+        {"VaR": VaR, "ES": ES},
+        index=returns.index[window:],
     )
 
     return df
@@ -55,6 +106,16 @@ def rolling_var_es_forecast(
 # 2) Kupiec POF Test — Unconditional Coverage
 # ============================================================
 
+@lru_cache(maxsize=32)
+def _log_pair(conf_level):
+    """
+    (log(p), log(1 - p)) for the expected violation rate p = 1 - conf_level.
+    Scalar math.log, cached per confidence level.
+    """
+    pi_expected = 1 - conf_level
+    return math.log(pi_expected), math.log(1 - pi_expected)
+
+
 def kupiec_pof_test(violations, conf_level=0.99):
     """
     Kupiec (1995) Proportion of Failures (POF) test.
@@ -62,22 +123,23 @@ def kupiec_pof_test(violations, conf_level=0.99):
     violations : array of 0/1 indicators for VaR breaches
     conf_level : VaR confidence (e.g. 0.99)
     """
-    violations = np.array(violations)
+    violations = np.asarray(violations, dtype=np.int8)
     T = len(violations)
     N = violations.sum()
 
     pi_expected = 1 - conf_level
     pi_empirical = N / T
+    log_pi, log_1m_pi = _log_pair(conf_level)
 
-    # Likelihood ratio
+    # Likelihood ratio (np.log on the empirical rate: it may be 0 or 1)
     LR = -2 * (
-        (T - N) * np.log(1 - pi_expected) +
-        N * np.log(pi_expected)
+        (T - N) * log_1m_pi +
+        N * log_pi
         - (T - N) * np.log(1 - pi_empirical)
         - N * np.log(pi_empirical)
     )
 
-    p_value = 1 - chi2.cdf(LR, df=1)
+    p_value = chi2.sf(LR, df=1)
 
     return {
         "T": T,
@@ -99,14 +161,12 @@ def christoffersen_test(violations, conf_level=0.99):
 
     violations: array of 0/1 VaR violation indicators
     """
-    v = np.array(violations)
+    v = np.asarray(violations, dtype=np.int8)
     T = len(v)
 
-    # Count transitions
-    n00 = np.sum((v[:-1] == 0) & (v[1:] == 0))
-    n01 = np.sum((v[:-1] == 0) & (v[1:] == 1))
-    n10 = np.sum((v[:-1] == 1) & (v[1:] == 0))
-    n11 = np.sum((v[:-1] == 1) & (v[1:] == 1))
+    # Count transitions in one pass: code = 2 * v[t-1] + v[t] in {0..3}
+    codes = (v[:-1] << 1) | v[1:]
+    n00, n01, n10, n11 = np.bincount(codes, minlength=4)[:4]
 
     # Transition probabilities for 2-state Markov chain
     pi0 = n01 / (n00 + n01 + 1e-12)
@@ -115,24 +175,26 @@ def christoffersen_test(violations, conf_level=0.99):
     # Unconditional probability
     pi_hat = (n01 + n11) / (T - 1)
 
+    log_pi, log_1m_pi = _log_pair(conf_level)
+
     # Unconditional coverage LR
     LR_uc = -2 * (
-        (n00 + n01) * np.log(1 - (1 - conf_level)) +
-        (n10 + n11) * np.log(1 - conf_level)
+        (n00 + n01) * log_1m_pi +
+        (n10 + n11) * log_pi
         - (n00 * np.log(1 - pi_hat) + (n01 + n11) * np.log(pi_hat))
     )
 
     # Independence LR
     L_ind = (
-        n00 * np.log(1 - pi0 + 1e-12) +
-        n01 * np.log(pi0 + 1e-12) +
-        n10 * np.log(1 - pi1 + 1e-12) +
-        n11 * np.log(pi1 + 1e-12)
+        n00 * math.log(1 - pi0 + 1e-12) +
+        n01 * math.log(pi0 + 1e-12) +
+        n10 * math.log(1 - pi1 + 1e-12) +
+        n11 * math.log(pi1 + 1e-12)
     )
 
     L_uc = (
-        (n00 + n10) * np.log(1 - pi_hat + 1e-12) +
-        (n01 + n11) * np.log(pi_hat + 1e-12)
+        (n00 + n10) * math.log(1 - pi_hat + 1e-12) +
+        (n01 + n11) * math.log(pi_hat + 1e-12)
     )
 
     LR_ind = -2 * (L_uc - L_ind)
@@ -144,11 +206,11 @@ def christoffersen_test(violations, conf_level=0.99):
         "n00": n00, "n01": n01,
         "n10": n10, "n11": n11,
         "LR_uc": LR_uc,
-        "p_uc": 1 - chi2.cdf(LR_uc, 1),
+        "p_uc": chi2.sf(LR_uc, 1),
         "LR_ind": LR_ind,
-        "p_ind": 1 - chi2.cdf(LR_ind, 1),
+        "p_ind": chi2.sf(LR_ind, 1),
         "LR_cc": LR_cc,
-        "p_cc": 1 - chi2.cdf(LR_cc, 2),
+        "p_cc": chi2.sf(LR_cc, 2),
     }
 
 
@@ -163,24 +225,39 @@ def acerbi_szekely_unconditional(losses, var_es_forecast, conf_level=0.975):
     losses          : Series of actual losses (aligned with forecast)
     var_es_forecast : DataFrame with 'VaR' and 'ES' forecasts
     """
-    losses = np.array(losses)
-    VaR = np.array(var_es_forecast["VaR"])
-    ES = np.array(var_es_forecast["ES"])
+    losses = np.asarray(losses, dtype=np.float64)
+    VaR = np.asarray(var_es_forecast["VaR"], dtype=np.float64)
+    ES = np.asarray(var_es_forecast["ES"], dtype=np.float64)
 
     T = len(losses)
 
-    # Indicator of violation
-    I = (losses > VaR).astype(float)
-
-    # Z_t statistic
-    Z = I * ((losses - ES) / ES)
-
-    Z_bar = Z.mean()
-    Z_std = Z.std(ddof=1)
+    if acerbi_szekely_stats_nb is not None:
+        # Fused single pass: sum and sum of squares of Z_t
+        s, s2 = acerbi_szekely_stats_nb(
+            np.ascontiguousarray(losses),
+            np.ascontiguousarray(VaR),
+            np.ascontiguousarray(ES),
+        )
+        # Degenerate samples give NaN, as Z.mean() / Z.std(ddof=1) do
+        Z_bar = s / T if T > 0 else np.nan
+        Z_std = (np.sqrt(max(s2 - T * Z_bar * Z_bar, 0.0) / (T - 1))
+                 if T > 1 else np.nan)
+    else:
+        # Indicator of violation (kept boolean, no float copy)
+        mask = losses > VaR
+
+        # Z_t statistic: (loss - ES) / ES on violation days, 0 otherwise
+        Z = np.empty_like(losses, dtype=np.float64)
+        np.subtract(losses, ES, out=Z)
+        np.divide(Z, ES, out=Z)
+        Z[~mask] = 0.0
+
+        Z_bar = Z.mean()
+        Z_std = Z.std(ddof=1)
     Z_score = np.sqrt(T) * Z_bar / (Z_std + 1e-12)
 
     # One-sided test: H1 = ES underestimated → Z > 0
-    p_value = 1 - norm.cdf(Z_score)
+    p_value = norm.sf(Z_score)
 
     return {
         "T": T,
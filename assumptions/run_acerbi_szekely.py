@@ -17,6 +17,19 @@ from backtesting import (
 )
 
 
+def print_results(res, conf_level):
+    print("=== Acerbi–Szekely ES Backtest (Unconditional) ===")
+    print(f"Confidence level (ES): {conf_level:.3f}")
+    print(f"T (obs): {res['T']}")
+    print(f"Z_bar:   {res['Z_bar']:.6f}")
+    print(f"Z_score: {res['Z_score']:.4f}")
+    print(f"p-value (one-sided): {res['p_value']:.4f}")
+    print("\nInterpretation:")
+    print("  - H0: ES model is correct (no systematic underestimation).")
+    print("  - H1: ES is too low (underestimation of tail risk).")
+    print("  - Small p-value → reject H0 → your ES model is too optimistic.")
+
+
 def main():
     # 1. Load historical returns
     prices, returns_hist = get_prices_and_returns(start=START_DATE, end=END_DATE)
@@ -46,16 +59,7 @@ def main():
         conf_level=conf_level,
     )
 
-    print("=== Acerbi–Szekely ES Backtest (Unconditional) ===")
-    print(f"Confidence level (ES): {conf_level:.3f}")
-    print(f"T (obs): {res['T']}")
-    print(f"Z_bar:   {res['Z_bar']:.6f}")
-    print(f"Z_score: {res['Z_score']:.4f}")
-    print(f"p-value (one-sided): {res['p_value']:.4f}")
-    print("\nInterpretation:")
-    print("  - H0: ES model is correct (no systematic underestimation).")
-    print("  - H1: ES is too low (underestimation of tail risk).")
-    print("  - Small p-value → reject H0 → your ES model is too optimistic.")
+    print_results(res, conf_level)
 
 
 if __name__ == "__main__":
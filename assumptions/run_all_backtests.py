@@ -0,0 +1,68 @@
+# assumptions/run_all_backtests.py
+
+import os
+import sys
+import numpy as np
+
+# --- Make parent folder importable ---
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.append(ROOT_DIR)
+
+from data_loader import get_prices_and_returns
+from config import WEIGHTS, START_DATE, END_DATE
+from backtesting import (
+    rolling_var_es_forecast,
+    kupiec_pof_test,
+    christoffersen_test,
+    acerbi_szekely_unconditional,
+)
+import run_kupiec
+import run_christoffersen
+import run_acerbi_szekely
+
+
+def main():
+    # 1. Load historical returns (once)
+    prices, returns_hist = get_prices_and_returns(start=START_DATE, end=END_DATE)
+
+    # 2. Portfolio returns for current weights
+    w = np.array(WEIGHTS, dtype=float)
+    w = w / w.sum()
+    port_ret = returns_hist.dot(w).dropna()
+
+    # 3. Rolling VaR/ES forecasts (once, shared by all three tests)
+    conf_level = 0.99
+    window = 250
+
+    var_es_forecast = rolling_var_es_forecast(
+        port_ret,
+        conf_level=conf_level,
+        window=window,
+    )
+
+    # 4. Losses and violations aligned with forecast
+    losses = -port_ret.loc[var_es_forecast.index]
+    violations = (losses > var_es_forecast["VaR"]).astype(int).values
+
+    # 5. Run all tests on the same arrays
+    run_kupiec.print_results(
+        kupiec_pof_test(violations, conf_level=conf_level), conf_level
+    )
+    print()
+    run_christoffersen.print_results(
+        christoffersen_test(violations, conf_level=conf_level), conf_level
+    )
+    print()
+    run_acerbi_szekely.print_results(
+        acerbi_szekely_unconditional(
+            losses=losses,
+            var_es_forecast=var_es_forecast,
+            conf_level=conf_level,
+        ),
+        conf_level,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -14,6 +14,29 @@ from config import WEIGHTS, START_DATE, END_DATE
 from backtesting import rolling_var_es_forecast, christoffersen_test
 
 
+def print_results(res, conf_level):
+    print("=== Christoffersen Conditional Coverage Test ===")
+    print(f"Confidence level (VaR): {conf_level:.3f}")
+    print(f"Transition counts:")
+    print(f"  n00: {res['n00']}  (no→no)")
+    print(f"  n01: {res['n01']}  (no→yes)")
+    print(f"  n10: {res['n10']}  (yes→no)")
+    print(f"  n11: {res['n11']}  (yes→yes)")
+    print()
+    print(f"Unconditional coverage:")
+    print(f"  LR_uc: {res['LR_uc']:.4f}, p_uc: {res['p_uc']:.4f}")
+    print()
+    print(f"Independence:")
+    print(f"  LR_ind: {res['LR_ind']:.4f}, p_ind: {res['p_ind']:.4f}")
+    print()
+    print(f"Conditional coverage (joint):")
+    print(f"  LR_cc: {res['LR_cc']:.4f}, p_cc: {res['p_cc']:.4f}")
+    print("\nInterpretation:")
+    print("  - p_ind tests clustering in violations (independence).")
+    print("  - p_cc combines unconditional coverage + independence.")
+    print("  - Low p-values → the VaR model fails the conditional coverage test.")
+
+
 def main():
     # 1. Load historical returns
     prices, returns_hist = get_prices_and_returns(start=START_DATE, end=END_DATE)
@@ -40,26 +63,7 @@ def main():
     # 5. Run Christoffersen test
     res = christoffersen_test(violations, conf_level=conf_level)
 
-    print("=== Christoffersen Conditional Coverage Test ===")
-    print(f"Confidence level (VaR): {conf_level:.3f}")
-    print(f"Transition counts:")
-    print(f"  n00: {res['n00']}  (no→no)")
-    print(f"  n01: {res['n01']}  (no→yes)")
-    print(f"  n10: {res['n10']}  (yes→no)")
-    print(f"  n11: {res['n11']}  (yes→yes)")
-    print()
-    print(f"Unconditional coverage:")
-    print(f"  LR_uc: {res['LR_uc']:.4f}, p_uc: {res['p_uc']:.4f}")
-    print()
-    print(f"Independence:")
-    print(f"  LR_ind: {res['LR_ind']:.4f}, p_ind: {res['p_ind']:.4f}")
-    print()
-    print(f"Conditional coverage (joint):")
-    print(f"  LR_cc: {res['LR_cc']:.4f}, p_cc: {res['p_cc']:.4f}")
-    print("\nInterpretation:")
-    print("  - p_ind tests clustering in violations (independence).")
-    print("  - p_cc combines unconditional coverage + independence.")
-    print("  - Low p-values → the VaR model fails the conditional coverage test.")
+    print_results(res, conf_level)
 
 
 if __name__ == "__main__":
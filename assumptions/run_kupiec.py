@@ -14,6 +14,20 @@ from config import WEIGHTS, START_DATE, END_DATE
 from backtesting import rolling_var_es_forecast, kupiec_pof_test
 
 
+def print_results(res, conf_level):
+    print("=== Kupiec POF Test (Unconditional Coverage) ===")
+    print(f"Confidence level (VaR): {conf_level:.3f}")
+    print(f"Expected violation rate: {res['viol_rate_expected']:.4%}")
+    print(f"Empirical violation rate: {res['viol_rate_empirical']:.4%}")
+    print(f"T (obs): {res['T']}")
+    print(f"N (violations): {res['N']}")
+    print(f"LR_uc: {res['LR_uc']:.4f}")
+    print(f"p-value: {res['p_value']:.4f}")
+    print("\nInterpretation:")
+    print("  - Low p-value → reject H0 (model has wrong unconditional coverage).")
+    print("  - High p-value → cannot reject H0 (coverage is consistent with model).")
+
+
 def main():
     # 1. Load historical returns
     prices, returns_hist = get_prices_and_returns(start=START_DATE, end=END_DATE)
@@ -40,17 +54,7 @@ def main():
     # 5. Run Kupiec POF test
     res = kupiec_pof_test(violations, conf_level=conf_level)
 
-    print("=== Kupiec POF Test (Unconditional Coverage) ===")
-    print(f"Confidence level (VaR): {conf_level:.3f}")
-    print(f"Expected violation rate: {res['viol_rate_expected']:.4%}")
-    print(f"Empirical violation rate: {res['viol_rate_empirical']:.4%}")
-    print(f"T (obs): {res['T']}")
-    print(f"N (violations): {res['N']}")
-    print(f"LR_uc: {res['LR_uc']:.4f}")
-    print(f"p-value: {res['p_value']:.4f}")
-    print("\nInterpretation:")
-    print("  - Low p-value → reject H0 (model has wrong unconditional coverage).")
-    print("  - High p-value → cannot reject H0 (coverage is consistent with model).")
+    print_results(res, conf_level)
 
 
 if __name__ == "__main__":
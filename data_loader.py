@@ -1,22 +1,32 @@
 # data_loader.py
 
+import hashlib
+import os
+import time
+
 import numpy as np
 import pandas as pd
 import yfinance as yf
 
+# On-disk cache of yfinance downloads (parquet), refreshed after one day
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache")
+CACHE_MAX_AGE = 24 * 60 * 60  # seconds
+
 
-def get_prices_and_returns(start="2015-01-01", end=None):
+def _download_prices(tickers, start, end, use_cache=True):
     """
-    Downloads BTC/EUR, Gold (USD), IWDA.AS, and EURUSD.
-    Converts Gold to EUR and returns (prices_eur, returns).
+    Close prices for `tickers` from yfinance, memoised on disk by
+    (tickers, start, end).
     """
+    key = hashlib.md5(f"{tickers}|{start}|{end}".encode()).hexdigest()
+    path = os.path.join(CACHE_DIR, f"prices_{key}.parquet")
 
-    BTC_TICKER = "BTC-EUR"      # Bitcoin in EUR
-    IWDA_TICKER = "IWDA.AS"     # MSCI World ETF in EUR
-    GOLD_TICKER = "GC=F"        # Gold futures in USD
-    EURUSD_TICKER = "EURUSD=X"  # FX rate: USD per 1 EUR
-
-    tickers = [BTC_TICKER, IWDA_TICKER, GOLD_TICKER, EURUSD_TICKER]
+    if use_cache and os.path.exists(path):
+        if time.time() - os.path.getmtime(path) < CACHE_MAX_AGE:
+            try:
+                return pd.read_parquet(path)
+            except (ImportError, ValueError, OSError):
+                pass  # no parquet engine / unreadable file: download again
 
     data = yf.download(
         tickers=tickers,
@@ -32,6 +42,40 @@ def get_prices_and_returns(start="2015-01-01", end=None):
     else:
         prices_raw = data["Close"].copy()
 
+    # Only cache complete downloads: an empty frame or a ticker with no
+    # data at all (failed request) would otherwise stick for a day
+    complete = not prices_raw.empty and not prices_raw.isna().all().any()
+
+    if use_cache and complete:
+        try:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            prices_raw.to_parquet(path, compression="zstd")
+        except (ImportError, ValueError, OSError):
+            # Caching is best effort (e.g. pyarrow missing): the prices are
+            # already in memory, so carry on without it
+            pass
+
+    return prices_raw
+
+
+def get_prices_and_returns(start="2015-01-01", end=None, use_cache=True):
+    """
+    Downloads BTC/EUR, Gold (USD), IWDA.AS, and EURUSD.
+    Converts Gold to EUR and returns (prices_eur, returns).
+
+    use_cache : reuse a download of the same (start, end) made within the
+                last day, stored as parquet under .cache/
+    """
+
+    BTC_TICKER = "BTC-EUR"      # Bitcoin in EUR
+    IWDA_TICKER = "IWDA.AS"     # MSCI World ETF in EUR
+    GOLD_TICKER = "GC=F"        # Gold futures in USD
+    EURUSD_TICKER = "EURUSD=X"  # FX rate: USD per 1 EUR
+
+    tickers = [BTC_TICKER, IWDA_TICKER, GOLD_TICKER, EURUSD_TICKER]
+
+    prices_raw = _download_prices(tickers, start, end, use_cache=use_cache)
+
     prices = prices_raw.rename(columns={
         BTC_TICKER: "BTC_EUR",
         IWDA_TICKER: "IWDA_EUR",
@@ -46,8 +90,13 @@ def get_prices_and_returns(start="2015-01-01", end=None):
     # Keep only BTC, GOLD (EUR), IWDA in EUR
     prices_eur = prices[["BTC_EUR", "GOLD_EUR", "IWDA_EUR"]].dropna()
 
-    # Daily log-returns
-    returns = np.log(prices_eur / prices_eur.shift(1)).dropna()
+    # Daily log-returns: r_t = log p_t - log p_{t-1}
+    log_p = np.log(prices_eur.to_numpy())
+    returns = pd.DataFrame(
+        np.diff(log_p, axis=0),
+        index=prices_eur.index[1:],
+        columns=prices_eur.columns,
+    )
 
     return prices_eur, returns
 if __name__ == "__main__":
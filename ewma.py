@@ -1,7 +1,25 @@
 import numpy as np
 import pandas as pd
+from scipy.signal import lfilter
 from scipy.stats import norm
 
+from _jit import HAVE_NUMBA, njit
+
+
+@njit(cache=True, fastmath=True)
+def _ewma_var(r, lam, init):
+    """
+    EWMA variance recursion on a plain float array:
+    out[t] = lam * out[t-1] + (1 - lam) * r[t-1]**2, out[0] = init.
+    """
+    out = np.empty(r.shape[0])
+    out[0] = init
+    one_m = 1.0 - lam
+    for t in range(1, r.shape[0]):
+        out[t] = lam * out[t - 1] + one_m * r[t - 1] * r[t - 1]
+    return out
+
+
 def ewma_volatility(returns, lam=0.94):
     """
     Compute EWMA volatility time series (RiskMetrics model).
@@ -10,13 +28,20 @@ def ewma_volatility(returns, lam=0.94):
     lam     : decay factor (lambda)
     """
     returns = returns.dropna()
-    ewma_var = np.zeros(len(returns))
-    
+    r = returns.to_numpy(dtype=np.float64)
+
     # initialize with unconditional variance
-    ewma_var[0] = returns.var()
+    init = float(returns.var())
 
-    for t in range(1, len(returns)):
-        ewma_var[t] = lam * ewma_var[t-1] + (1-lam) * returns.iloc[t-1]**2
+    if HAVE_NUMBA:
+        ewma_var = _ewma_var(r, float(lam), init)
+    else:
+        # Same recursion as a first-order IIR filter on r[t-1]**2:
+        # y[0] = (1 - lam) * r[0]**2 + lam * init is ewma_var[1], etc.
+        ewma_var = np.empty(len(r))
+        ewma_var[0] = init
+        ewma_var[1:] = lfilter([1 - lam], [1, -lam], r[:-1] ** 2,
+                               zi=[lam * init])[0]
 
     ewma_vol = np.sqrt(ewma_var)
     return pd.Series(ewma_vol, index=returns.index)
@@ -19,6 +19,7 @@ from ewma import ewma_var_es   # <-- NEW IMPORT
 def main():
     # Optional: reproducible simulation
     #np.random.seed(42)
+    rng = None   # e.g. np.random.default_rng(42)
 
     # Ensure figures directory exists
     os.makedirs("figures", exist_ok=True)
@@ -43,7 +44,8 @@ def main():
     returns = simulate_student_t_returns(
         historical_returns=returns_hist,
         n_days=returns_hist.shape[0] * 5,
-        df=5
+        df=5,
+        rng=rng
     )
 
     print("Sample of SIMULATED Student-t returns:")
@@ -1,12 +1,63 @@
 # mc_sim.py
 
+import os
+from concurrent.futures import ThreadPoolExecutor
+
 import numpy as np
 import pandas as pd
 
+from _jit import HAVE_NUMBA, njit, prange
+
+# Rows per independent RNG stream. Fixed (not tied to the core count) so a
+# seeded Generator gives the same scenarios on every machine.
+SIM_CHUNK_ROWS = 16384
+
+
+@njit(parallel=True, cache=True)
+def _sim_chunk(z, scale, L_T, mu, out):
+    """
+    out[t] = mu + (z[t] @ L_T) * scale[t], one row per parallel iteration.
+    """
+    n, K = z.shape
+    for t in prange(n):
+        for j in range(K):
+            s = 0.0
+            for i in range(K):
+                s += z[t, i] * L_T[i, j]
+            out[t, j] = mu[j] + s * scale[t]
+
+
+def _draw_normals_and_chi2(rng, n_days, n_assets, df):
+    """
+    Draw z ~ N(0, I) and g ~ chi2(df) in row chunks, each from its own
+    child stream of rng, filled concurrently (the Generator fills release
+    the GIL).
+    """
+    n_chunks = max(1, -(-n_days // SIM_CHUNK_ROWS))
+    streams = rng.spawn(n_chunks)
+    bounds = [c * SIM_CHUNK_ROWS for c in range(n_chunks)] + [n_days]
+
+    z = np.empty((n_days, n_assets))
+    g = np.empty(n_days)
+
+    def draw(c):
+        lo, hi = bounds[c], bounds[c + 1]
+        streams[c].standard_normal(out=z[lo:hi])
+        g[lo:hi] = streams[c].chisquare(df, size=hi - lo)
+
+    if n_chunks == 1:
+        draw(0)
+    else:
+        with ThreadPoolExecutor(min(n_chunks, os.cpu_count() or 1)) as pool:
+            list(pool.map(draw, range(n_chunks)))
+
+    return z, g
+
 
 def simulate_student_t_returns(historical_returns,
                                n_days=252 * 5,
-                               df=12):
+                               df=12,
+                               rng=None):
     """
     Simulate multivariate Student-t returns with heavy tails,
     calibrated to historical mean & covariance.
@@ -20,6 +71,9 @@ def simulate_student_t_returns(historical_returns,
     df : int or float
         Degrees of freedom for the Student-t distribution.
         Lower df -> heavier tails (e.g. 3–7 is typical).
+    rng : numpy.random.Generator, optional
+        Random generator to draw from. Defaults to a fresh SFC64-backed
+        Generator; pass e.g. np.random.default_rng(42) for reproducibility.
 
     Returns
     -------
@@ -27,6 +81,9 @@ def simulate_student_t_returns(historical_returns,
         Simulated log-returns with same columns as historical_returns.
     """
 
+    if rng is None:
+        rng = np.random.Generator(np.random.SFC64())
+
     cols = historical_returns.columns
     n_assets = len(cols)
 
@@ -37,20 +94,24 @@ def simulate_student_t_returns(historical_returns,
     # Cholesky factor for covariance (for correlated normals)
     L = np.linalg.cholesky(cov)
 
-    # 1) Draw standard normals: shape (n_days, n_assets)
-    z = np.random.normal(size=(n_days, n_assets))
-
-    # 2) Correlated normals: each row ~ N(0, cov)
-    z_corr = z @ L.T
-
-    # 3) Draw chi-square variables for t-scaling
+    # 1) Draw standard normals z: shape (n_days, n_assets)
+    # 2) Draw chi-square variables for t-scaling
     #    g ~ chi2(df) / df  -> 1/sqrt(g) gives heavy tails
-    g = np.random.chisquare(df, size=n_days) / df
+    z, g = _draw_normals_and_chi2(rng, n_days, n_assets, df)
+    g /= df
     scale = 1.0 / np.sqrt(g)          # shape (n_days,)
 
-    # 4) Build multivariate Student-t:
-    #    r_t = mu + z_corr_t * scale_t
-    r = mu + z_corr * scale[:, None]
+    # 3) Build multivariate Student-t:
+    #    r_t = mu + (z_t @ L.T) * scale_t
+    if HAVE_NUMBA:
+        r = np.empty_like(z)
+        _sim_chunk(z, scale, np.ascontiguousarray(L.T), mu, r)
+    else:
+        # Scaling and the mean shift are applied in place on the single
+        # matmul output, so no z_corr / broadcast temporaries are kept.
+        r = z @ L.T
+        r *= scale[:, None]
+        r += mu
 
     # Wrap in DataFrame
     sim_returns = pd.DataFrame(r, columns=cols)
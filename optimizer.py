@@ -1,7 +1,30 @@
 import numpy as np
 from scipy.optimize import minimize
 
-from var_es import portfolio_var_es
+from _jit import njit
+
+
+@njit(cache=True)
+def _es_and_grad(R, w, k):
+    """
+    Historical ES of the portfolio R @ w (as a positive loss) and its
+    gradient w.r.t. w, from the k worst portfolio returns.
+
+    Uses a partition instead of a full sort. Ties at the VaR boundary
+    share the remaining tail weight, which gives a valid subgradient.
+    """
+    port_ret = R @ w
+    cut = np.partition(port_ret, k - 1)[k - 1]
+
+    below = port_ret < cut
+    at = port_ret == cut
+    n_below = below.sum()
+    w_at = (k - n_below) / at.sum()
+
+    tail_sum = port_ret[below].sum() + (k - n_below) * cut
+    tail_grad = R[below].sum(axis=0) + w_at * R[at].sum(axis=0)
+
+    return -tail_sum / k, -tail_grad / k
 
 
 def minimize_es_weights(returns_df,
@@ -13,15 +36,22 @@ def minimize_es_weights(returns_df,
     """
     n_assets = returns_df.shape[1]
 
+    # Invariant across SLSQP iterations: clean returns matrix and tail size
+    R = np.ascontiguousarray(returns_df.dropna().to_numpy(dtype=np.float64))
+    k = max(1, int(np.floor((1 - conf_level) * R.shape[0])))
+    scale = np.sqrt(horizon_days)
+
     def objective(w):
-        res = portfolio_var_es(
-            returns_df=returns_df,
-            weights=w,
-            conf_levels=[conf_level],
-            horizon_days=horizon_days
-        )
-        es_value = res.loc[conf_level, "ES"]
-        return es_value
+        # Same normalisation as portfolio_var_es: ES is taken at u = w / sum(w)
+        w = np.asarray(w, dtype=np.float64)
+        s = w.sum()
+        u = w / s
+
+        es_value, grad_u = _es_and_grad(R, u, k)
+
+        # Chain rule through the normalisation du/dw = (I - u 1^T) / s
+        grad_w = (grad_u - grad_u @ u) / s
+        return es_value * scale, grad_w * scale
 
     constraints = ({
         "type": "eq",
@@ -35,9 +65,11 @@ def minimize_es_weights(returns_df,
 
     x0 = np.ones(n_assets) / n_assets
 
+    # objective returns (ES, gradient)
     result = minimize(
         objective,
         x0,
+        jac=True,
         method="SLSQP",
         bounds=bounds,
         constraints=constraints
@@ -66,23 +98,41 @@ def maximize_sharpe_weights(returns_df,
     # Convert annual rf to daily rf (approx)
     rf_daily = risk_free_rate / annualization_factor
 
-    def sharpe_to_maximize(w):
-        w = np.array(w)
-        w = w / w.sum()  # normalize, just in case
-        port_ret = returns_df.dot(w).dropna()
-        mu = port_ret.mean()
-        sigma = port_ret.std()
+    # Sharpe is a closed-form function of the asset mean vector and
+    # covariance, so estimate them once instead of re-scanning the returns
+    # on every SLSQP step.
+    clean = returns_df.dropna()
+    mu = clean.mean().to_numpy()
+    Sigma = clean.cov().to_numpy()
+    sqrt_ann = np.sqrt(annualization_factor)
+
+    def sharpe_and_grad(w):
+        w = np.asarray(w, dtype=float)
+        s = w.sum()
+        u = w / s  # normalize, just in case
 
-        if sigma == 0:
-            return 0.0  # avoid division by zero
+        num = mu @ u - rf_daily
+        Sigma_u = Sigma @ u
+        var = u @ Sigma_u
 
-        sharpe_daily = (mu - rf_daily) / sigma
-        sharpe_annual = sharpe_daily * np.sqrt(annualization_factor)
-        return sharpe_annual
+        if var <= 0:
+            return 0.0, np.zeros_like(w)  # avoid division by zero
+
+        sigma = np.sqrt(var)
+        sharpe_annual = num / sigma * sqrt_ann
+
+        # d/du of (mu'u - rf) / sqrt(u'Σu), then through u = w / sum(w)
+        grad_u = (mu - num * Sigma_u / var) / sigma * sqrt_ann
+        grad_w = (grad_u - grad_u @ u) / s
+        return sharpe_annual, grad_w
+
+    def sharpe_to_maximize(w):
+        return sharpe_and_grad(w)[0]
 
     # We minimize negative Sharpe to maximize Sharpe
     def objective(w):
-        return -sharpe_to_maximize(w)
+        sharpe_annual, grad = sharpe_and_grad(w)
+        return -sharpe_annual, -grad
 
     # Sum weights = 1
     constraints = ({
@@ -98,9 +148,11 @@ def maximize_sharpe_weights(returns_df,
 
     x0 = np.ones(n_assets) / n_assets
 
+    # objective returns (-Sharpe, gradient)
     result = minimize(
         objective,
         x0,
+        jac=True,
         method="SLSQP",
         bounds=bounds,
         constraints=constraints
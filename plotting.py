@@ -1,9 +1,26 @@
 # plotting.py
 
+import math
+
 import numpy as np
 import matplotlib.pyplot as plt
+from scipy.stats import qmc
+
+from var_es import (
+    _var_es_from_port_returns,
+    portfolio_var_es_batch,
+    portfolio_var_es_cornish_fisher,
+    portfolio_var_es_gaussian,
+)
+
 
-from var_es import portfolio_var_es
+def _clean_returns(df):
+    """
+    Returns matrix without NaN rows, as a float64 ndarray. The NaN rows
+    are the same for every portfolio, so this runs once per plot instead
+    of a .dot(w).dropna() per portfolio.
+    """
+    return df.dropna().to_numpy(dtype=np.float64, copy=False)
 
 
 # ============================================================
@@ -15,7 +32,8 @@ def plot_portfolio_var_es(returns_df,
                           conf_level=0.95,
                           horizon_days=1,
                           bins=60,
-                          save_path=None):
+                          save_path=None,
+                          method="historical"):
     """
     Plot portfolio return distribution with VaR & ES lines.
 
@@ -25,61 +43,206 @@ def plot_portfolio_var_es(returns_df,
     horizon_days : holding period
     bins       : number of histogram bins
     save_path  : optional filepath to save the figure (PNG, etc.)
+    method     : VaR/ES model, "historical", "gaussian" or "cornish_fisher"
     """
 
-    # --- Portfolio returns ---
+    # --- Portfolio returns (one pass, reused for VaR/ES and histogram) ---
     w = np.array(weights, dtype=float)
     w = w / w.sum()
-    port_ret = returns_df.dot(w).dropna()
+    port_ret = _clean_returns(returns_df) @ w
 
     # --- VaR & ES ---
-    res = portfolio_var_es(
-        returns_df=returns_df,
-        weights=weights,
-        conf_levels=[conf_level],
-        horizon_days=horizon_days
-    )
-
-    var_value = res.loc[conf_level, "VaR"]
-    es_value = res.loc[conf_level, "ES"]
+    var_value, es_value = _var_es_from_port_returns(
+        port_ret, [conf_level], horizon_days, method=method
+    )[0]
 
     # Convert to return levels
     var_cut = -var_value
     es_cut = -es_value
 
     # --- Plot histogram ---
-    plt.figure(figsize=(10, 6))
-    plt.hist(port_ret, bins=bins, density=True, alpha=0.6)
+    fig, ax = plt.subplots(figsize=(10, 6))
+    counts, edges = np.histogram(port_ret, bins=bins, density=True)
+    ax.bar(edges[:-1], counts, width=np.diff(edges), align="edge", alpha=0.6)
 
     cl_pct = int(conf_level * 100)
 
     # VaR & ES lines
-    plt.axvline(var_cut, linestyle="--", linewidth=2,
-                label=f"{cl_pct}% VaR ({var_value:.2%})")
-    plt.axvline(es_cut, linestyle=":", linewidth=2,
-                label=f"{cl_pct}% ES ({es_value:.2%})")
+    ax.axvline(var_cut, linestyle="--", linewidth=2,
+               label=f"{cl_pct}% VaR ({var_value:.2%})")
+    ax.axvline(es_cut, linestyle=":", linewidth=2,
+               label=f"{cl_pct}% ES ({es_value:.2%})")
 
     # Labels
-    plt.title(f"Portfolio Return Distribution with {cl_pct}% VaR & ES")
-    plt.xlabel("Daily log return")
-    plt.ylabel("Density")
-    plt.legend()
-    plt.grid(alpha=0.2)
+    ax.set_title(f"Portfolio Return Distribution with {cl_pct}% VaR & ES")
+    ax.set_xlabel("Daily log return")
+    ax.set_ylabel("Density")
+    ax.legend()
+    ax.grid(alpha=0.2)
 
-    plt.tight_layout()
+    fig.tight_layout()
 
     # Save if requested
     if save_path is not None:
-        plt.savefig(save_path, dpi=300, bbox_inches="tight")
+        fig.savefig(save_path, dpi=300, bbox_inches="tight")
 
     plt.show()
-    plt.close()
+    plt.close(fig)
 
 
 # ============================================================
 # 2) Plot ES–Sharpe efficient frontier (random portfolios)
 # ============================================================
 
+def _sample_weights(n_assets, n_portfolios, sampler="dirichlet"):
+    """
+    (n_portfolios x n_assets) long-only weights, uniform on the simplex.
+
+    sampler : "dirichlet" (i.i.d. Dirichlet(1, ..., 1) draws) or "sobol"
+              (scrambled Sobol points mapped to the simplex by stick-breaking,
+              which covers it more evenly for the same number of portfolios)
+    """
+    if sampler == "dirichlet":
+        return np.random.dirichlet(np.ones(n_assets), size=n_portfolios)
+    if sampler != "sobol":
+        raise ValueError("sampler must be 'dirichlet' or 'sobol'")
+
+    if n_assets == 1:
+        return np.ones((n_portfolios, 1))
+
+    # Sobol points are balanced in blocks of 2^m: draw the next power of
+    # two and keep the first n_portfolios
+    m = int(np.ceil(np.log2(max(n_portfolios, 1))))
+    u = qmc.Sobol(d=n_assets - 1, scramble=True).random_base2(m)[:n_portfolios]
+
+    # Stick-breaking: piece i takes a Beta(1, n_assets - 1 - i) share of
+    # what is left (inverse CDF 1 - (1 - u)^(1/b)); this is uniform on
+    # the simplex
+    w = np.empty((len(u), n_assets))
+    remaining = np.ones(len(u))
+    for i in range(n_assets - 1):
+        share = 1.0 - (1.0 - u[:, i]) ** (1.0 / (n_assets - 1 - i))
+        w[:, i] = remaining * share
+        remaining -= w[:, i]
+    w[:, -1] = remaining
+    return w
+
+
+def _random_frontier(R, weights_mat, conf_level, horizon_days,
+                     rf_daily, annualization_factor, port_buf=None,
+                     method="historical", device="cpu"):
+    """
+    (ES, annualized Sharpe) for every row of weights_mat, all at once.
+
+    R is the clean (NaN-free) returns matrix. The Sharpe only needs each
+    portfolio's mean and std, which follow from the asset means m and
+    covariance C (mu = w @ m, sigma^2 = w @ C @ w) without touching the T
+    rows again. The (T x P) portfolio return matrix is built (one matmul)
+    only for the ES tail, so method="gaussian" skips it entirely.
+    Portfolios with zero volatility are dropped.
+
+    port_buf : optional float32 buffer of shape (>= T, P) that receives the
+               portfolio returns, so several calls can share one allocation
+    method   : "historical" (tail partition), "gaussian" (closed form from
+               the mu/sigma already needed for the Sharpe, no GEMM or tail
+               pass) or "cornish_fisher"
+    device   : "cpu" or "cuda" (GEMM and ES pass on the GPU via CuPy)
+    """
+    if device not in ("cpu", "cuda"):
+        raise ValueError("device must be 'cpu' or 'cuda'")
+
+    # Cross-moments, once: O(T N^2) here, then O(N^2) per portfolio (on
+    # the host for both devices, N is tiny)
+    m_assets = R.mean(axis=0)
+    C = np.atleast_2d(np.cov(R, rowvar=False))
+
+    mu = weights_mat @ m_assets
+    var = np.einsum("pi,ij,pj->p", weights_mat, C, weights_mat)
+    sigma = np.sqrt(np.maximum(var, 0.0))
+    valid = sigma > 0
+
+    # One fused pass over the P-vector; zero-vol entries divide by 1 and
+    # are masked out afterwards
+    sqrt_ann = math.sqrt(annualization_factor)
+    sharpe = ((mu - rf_daily) / np.where(valid, sigma, 1.0) * sqrt_ann)[valid]
+
+    if method == "gaussian":
+        es = portfolio_var_es_gaussian(
+            mu[valid], sigma[valid], [conf_level], horizon_days
+        )[0, :, 1]
+        return es, sharpe
+
+    if device == "cuda":
+        es = _frontier_es_cuda(R, weights_mat, mu, sigma, conf_level,
+                               horizon_days, method)
+        return es[valid], sharpe
+
+    # float32 GEMM + tail pass: the (T x P) result is half the size
+    es = portfolio_var_es_batch(
+        R, weights_mat.T, [conf_level], horizon_days, method=method,
+        dtype=np.float32, port_buf=port_buf
+    )[0, :, 1]
+    return es[valid], sharpe
+
+
+def _frontier_es_cuda(R, weights_mat, mu, sigma, conf_level, horizon_days,
+                      method):
+    """
+    ES of every row of weights_mat on the GPU: the GEMM and the tail (or
+    higher-moment) pass stay on the device and only the (P,) result is
+    copied back. mu / sigma are the host cross-moment estimates. CuPy is
+    imported only when this path is used.
+    """
+    import cupy as cp
+
+    R_g = cp.asarray(R, dtype=cp.float32)
+    W_g = cp.asarray(weights_mat.T, dtype=cp.float32)
+    port_mat = R_g @ W_g
+
+    if method == "historical":
+        k = max(1, int(np.floor((1 - conf_level) * port_mat.shape[0])))
+        tail = cp.partition(port_mat, k - 1, axis=0)[:k]
+        es = -tail.mean(axis=0, dtype=cp.float64) * np.sqrt(horizon_days)
+        return cp.asnumpy(es)
+
+    if method != "cornish_fisher":
+        raise ValueError(
+            "method must be 'historical', 'gaussian' or 'cornish_fisher'"
+        )
+
+    # Population (biased) moments, as scipy.stats.skew / kurtosis
+    d = port_mat - cp.asarray(mu, dtype=cp.float32)
+    m2 = (d * d).mean(axis=0, dtype=cp.float64)
+    skewness = (d**3).mean(axis=0, dtype=cp.float64) / m2**1.5
+    excess_kurt = (d**4).mean(axis=0, dtype=cp.float64) / m2**2 - 3
+
+    # Closed form over P scalars: cheap enough on the host
+    return portfolio_var_es_cornish_fisher(
+        mu, sigma, cp.asnumpy(skewness), cp.asnumpy(excess_kurt),
+        [conf_level], horizon_days
+    )[0, :, 1]
+
+
+def _portfolio_point(R, weights, conf_level, horizon_days,
+                     rf_daily, annualization_factor, method="historical"):
+    """
+    (ES, annualized Sharpe) of one portfolio on a clean returns matrix R,
+    from a single matmul and no pandas.
+    """
+    w = np.asarray(weights, dtype=float)
+    port_ret = R @ w
+
+    sharpe_daily = (port_ret.mean() - rf_daily) / port_ret.std(ddof=1)
+    sharpe = sharpe_daily * math.sqrt(annualization_factor)
+
+    # ES is positively homogeneous for every method: ES(w / sum(w)) = ES(w) /
+    # sum(w) matches portfolio_var_es' weight normalisation, no second matmul
+    es = _var_es_from_port_returns(
+        port_ret, [conf_level], horizon_days, method=method
+    )[0, 1]
+    return es / w.sum(), sharpe
+
+
 def plot_sharpe_vs_es_frontier(returns_df,
                                n_portfolios=2000,
                                conf_level=0.95,
@@ -88,7 +251,10 @@ def plot_sharpe_vs_es_frontier(returns_df,
                                annualization_factor=252,
                                es_opt_weights=None,
                                sharpe_opt_weights=None,
-                               save_path=None):
+                               save_path=None,
+                               method="historical",
+                               device="cpu",
+                               sampler="dirichlet"):
     """
     ES–Sharpe frontier using random long-only portfolios.
 
@@ -100,102 +266,70 @@ def plot_sharpe_vs_es_frontier(returns_df,
     es_opt_weights : optional (highlight ES-opt)
     sharpe_opt_weights : optional (highlight Sharpe-opt)
     save_path  : optional filepath to save the figure
+    method     : ES model, "historical", "gaussian" (fastest for large
+                 n_portfolios) or "cornish_fisher"
+    device     : "cpu" or "cuda" to run the random frontier on the GPU
+                 (needs CuPy)
+    sampler    : "dirichlet" or "sobol" (quasi-random, even coverage with
+                 fewer portfolios)
     """
 
     n_assets = returns_df.shape[1]
     rf_daily = risk_free_rate / annualization_factor
 
-    es_list = []
-    sharpe_list = []
-
-    # --- 1) Sample random portfolios (Dirichlet enforces sum=1 and w>=0) ---
-    weights_mat = np.random.dirichlet(np.ones(n_assets), size=n_portfolios)
+    # Clean returns matrix, once
+    R = _clean_returns(returns_df)
 
-    for w in weights_mat:
-        port_ret = returns_df.dot(w).dropna()
-        mu = port_ret.mean()
-        sigma = port_ret.std()
+    # --- 1) Sample random portfolios (sum=1 and w>=0) ---
+    weights_mat = _sample_weights(n_assets, n_portfolios, sampler)
 
-        if sigma == 0:
-            continue
-
-        # Sharpe
-        sharpe_daily = (mu - rf_daily) / sigma
-        sharpe_annual = sharpe_daily * np.sqrt(annualization_factor)
-
-        # ES
-        es_df = portfolio_var_es(
-            returns_df=returns_df,
-            weights=w,
-            conf_levels=[conf_level],
-            horizon_days=horizon_days
-        )
-        es_value = es_df.loc[conf_level, "ES"]
-
-        sharpe_list.append(sharpe_annual)
-        es_list.append(es_value)
-
-    es_arr = np.array(es_list)
-    sharpe_arr = np.array(sharpe_list)
+    es_arr, sharpe_arr = _random_frontier(
+        R, weights_mat, conf_level, horizon_days,
+        rf_daily, annualization_factor, method=method, device=device
+    )
 
     # --- 2) Plot the random frontier ---
-    plt.figure(figsize=(10, 6))
-    plt.scatter(es_arr, sharpe_arr, alpha=0.4, s=10,
-                label="Random portfolios")
+    fig, ax = plt.subplots(figsize=(10, 6))
+    ax.scatter(es_arr, sharpe_arr, alpha=0.4, s=10,
+               label="Random portfolios")
 
     cl_pct = int(conf_level * 100)
 
     # --- 3) ES-optimal marker ---
     if es_opt_weights is not None:
-        port_ret_es = returns_df.dot(es_opt_weights).dropna()
-        mu_es = port_ret_es.mean()
-        sigma_es = port_ret_es.std()
-        sharpe_es = ((mu_es - rf_daily) / sigma_es) * np.sqrt(annualization_factor)
-
-        es_df_es = portfolio_var_es(
-            returns_df=returns_df,
-            weights=es_opt_weights,
-            conf_levels=[conf_level],
-            horizon_days=horizon_days
+        es_val_es, sharpe_es = _portfolio_point(
+            R, es_opt_weights, conf_level, horizon_days,
+            rf_daily, annualization_factor, method=method
         )
-        es_val_es = es_df_es.loc[conf_level, "ES"]
 
-        plt.scatter([es_val_es], [sharpe_es],
-                    marker="x", s=120, linewidths=2, color="red",
-                    label="ES-optimal")
+        ax.scatter(es_val_es, sharpe_es,
+                   marker="x", s=120, linewidths=2, color="red",
+                   label="ES-optimal")
 
     # --- 4) Sharpe-optimal marker ---
     if sharpe_opt_weights is not None:
-        port_ret_sh = returns_df.dot(sharpe_opt_weights).dropna()
-        mu_sh = port_ret_sh.mean()
-        sigma_sh = port_ret_sh.std()
-        sharpe_sh = ((mu_sh - rf_daily) / sigma_sh) * np.sqrt(annualization_factor)
-
-        es_df_sh = portfolio_var_es(
-            returns_df=returns_df,
-            weights=sharpe_opt_weights,
-            conf_levels=[conf_level],
-            horizon_days=horizon_days
+        es_val_sh, sharpe_sh = _portfolio_point(
+            R, sharpe_opt_weights, conf_level, horizon_days,
+            rf_daily, annualization_factor, method=method
         )
-        es_val_sh = es_df_sh.loc[conf_level, "ES"]
 
-        plt.scatter([es_val_sh], [sharpe_sh],
-                    marker="D", s=120, color="green",
-                    label="Sharpe-optimal")
+        ax.scatter(es_val_sh, sharpe_sh,
+                   marker="D", s=120, color="green",
+                   label="Sharpe-optimal")
 
     # --- 5) Labels & formatting ---
-    plt.xlabel(f"{cl_pct}% ES (expected tail loss)")
-    plt.ylabel("Annualized Sharpe ratio")
-    plt.title(f"ES–Sharpe Frontier ({cl_pct}% ES)")
-    plt.grid(alpha=0.2)
-    plt.legend()
-    plt.tight_layout()
+    ax.set_xlabel(f"{cl_pct}% ES (expected tail loss)")
+    ax.set_ylabel("Annualized Sharpe ratio")
+    ax.set_title(f"ES–Sharpe Frontier ({cl_pct}% ES)")
+    ax.grid(alpha=0.2)
+    ax.legend()
+    fig.tight_layout()
 
     if save_path is not None:
-        plt.savefig(save_path, dpi=300, bbox_inches="tight")
+        fig.savefig(save_path, dpi=300, bbox_inches="tight")
 
     plt.show()
-    plt.close()
+    plt.close(fig)
 
 
 # ============================================================
@@ -211,7 +345,10 @@ def plot_hist_vs_sim_frontier(returns_hist,
                               annualization_factor=252,
                               es_opt_weights=None,
                               sharpe_opt_weights=None,
-                              save_path=None):
+                              save_path=None,
+                              method="historical",
+                              device="cpu",
+                              sampler="dirichlet"):
     """
     Compare ES–Sharpe frontier for historical vs simulated returns
     on a single plot.
@@ -221,119 +358,85 @@ def plot_hist_vs_sim_frontier(returns_hist,
     es_opt_weights, sharpe_opt_weights : typically the optimals
                                          from the SIMULATED world.
     save_path  : optional filepath to save the figure
+    method     : ES model, "historical", "gaussian" or "cornish_fisher"
+    device     : "cpu" or "cuda" to run both frontiers on the GPU
+                 (needs CuPy)
+    sampler    : "dirichlet" or "sobol" random weights
     """
 
     n_assets = returns_hist.shape[1]
     rf_daily = risk_free_rate / annualization_factor
 
-    es_hist_list, sharpe_hist_list = [], []
-    es_sim_list, sharpe_sim_list = [], []
+    # Clean returns matrices, once per world
+    R_hist = _clean_returns(returns_hist)
+    R_sim = _clean_returns(returns_sim)
 
     # 1) Sample random long-only weights
-    weights_mat = np.random.dirichlet(np.ones(n_assets), size=n_portfolios)
-
-    for w in weights_mat:
-        # ----- Historical -----
-        port_hist = returns_hist.dot(w).dropna()
-        mu_h = port_hist.mean()
-        sigma_h = port_hist.std()
-        if sigma_h > 0:
-            sharpe_h_daily = (mu_h - rf_daily) / sigma_h
-            sharpe_h = sharpe_h_daily * np.sqrt(annualization_factor)
-
-            es_h_df = portfolio_var_es(
-                returns_df=returns_hist,
-                weights=w,
-                conf_levels=[conf_level],
-                horizon_days=horizon_days
-            )
-            es_h = es_h_df.loc[conf_level, "ES"]
-
-            sharpe_hist_list.append(sharpe_h)
-            es_hist_list.append(es_h)
-
-        # ----- Simulated -----
-        port_sim = returns_sim.dot(w).dropna()
-        mu_s = port_sim.mean()
-        sigma_s = port_sim.std()
-        if sigma_s > 0:
-            sharpe_s_daily = (mu_s - rf_daily) / sigma_s
-            sharpe_s = sharpe_s_daily * np.sqrt(annualization_factor)
-
-            es_s_df = portfolio_var_es(
-                returns_df=returns_sim,
-                weights=w,
-                conf_levels=[conf_level],
-                horizon_days=horizon_days
-            )
-            es_s = es_s_df.loc[conf_level, "ES"]
-
-            sharpe_sim_list.append(sharpe_s)
-            es_sim_list.append(es_s)
-
-    es_hist_arr = np.array(es_hist_list)
-    sharpe_hist_arr = np.array(sharpe_hist_list)
-    es_sim_arr = np.array(es_sim_list)
-    sharpe_sim_arr = np.array(sharpe_sim_list)
+    weights_mat = _sample_weights(n_assets, n_portfolios, sampler)
+
+    # One (T x P) buffer, sized for the longer sample, reused by both GEMMs
+    # (gaussian and the GPU never build the matrix on the host)
+    port_buf = None
+    if device == "cpu" and method != "gaussian":
+        port_buf = np.empty((max(len(R_hist), len(R_sim)), n_portfolios),
+                            dtype=np.float32)
+
+    # ----- Historical -----
+    es_hist_arr, sharpe_hist_arr = _random_frontier(
+        R_hist, weights_mat, conf_level, horizon_days,
+        rf_daily, annualization_factor, port_buf=port_buf,
+        method=method, device=device
+    )
+
+    # ----- Simulated -----
+    es_sim_arr, sharpe_sim_arr = _random_frontier(
+        R_sim, weights_mat, conf_level, horizon_days,
+        rf_daily, annualization_factor, port_buf=port_buf,
+        method=method, device=device
+    )
 
     cl_pct = int(conf_level * 100)
 
-    plt.figure(figsize=(10, 6))
+    fig, ax = plt.subplots(figsize=(10, 6))
 
     # Historical frontier
-    plt.scatter(es_hist_arr, sharpe_hist_arr,
-                alpha=0.35, s=10, label="Historical", color="C0")
+    ax.scatter(es_hist_arr, sharpe_hist_arr,
+               alpha=0.35, s=10, label="Historical", color="C0")
 
     # Simulated frontier
-    plt.scatter(es_sim_arr, sharpe_sim_arr,
-                alpha=0.35, s=10, label="Simulated (Student-t)", color="C1")
+    ax.scatter(es_sim_arr, sharpe_sim_arr,
+               alpha=0.35, s=10, label="Simulated (Student-t)", color="C1")
 
     # ES-optimal / Sharpe-optimal from SIMULATED world
     if es_opt_weights is not None:
-        port_es = returns_sim.dot(es_opt_weights).dropna()
-        mu_es = port_es.mean()
-        sigma_es = port_es.std()
-        sharpe_es = ((mu_es - rf_daily) / sigma_es) * np.sqrt(annualization_factor)
-
-        es_es_df = portfolio_var_es(
-            returns_df=returns_sim,
-            weights=es_opt_weights,
-            conf_levels=[conf_level],
-            horizon_days=horizon_days
+        es_es, sharpe_es = _portfolio_point(
+            R_sim, es_opt_weights, conf_level, horizon_days,
+            rf_daily, annualization_factor, method=method
         )
-        es_es = es_es_df.loc[conf_level, "ES"]
 
-        plt.scatter([es_es], [sharpe_es],
-                    marker="x", s=120, linewidths=2, color="red",
-                    label="ES-optimal (sim)")
+        ax.scatter(es_es, sharpe_es,
+                   marker="x", s=120, linewidths=2, color="red",
+                   label="ES-optimal (sim)")
 
     if sharpe_opt_weights is not None:
-        port_sh = returns_sim.dot(sharpe_opt_weights).dropna()
-        mu_sh = port_sh.mean()
-        sigma_sh = port_sh.std()
-        sharpe_sh = ((mu_sh - rf_daily) / sigma_sh) * np.sqrt(annualization_factor)
-
-        es_sh_df = portfolio_var_es(
-            returns_df=returns_sim,
-            weights=sharpe_opt_weights,
-            conf_levels=[conf_level],
-            horizon_days=horizon_days
+        es_sh, sharpe_sh = _portfolio_point(
+            R_sim, sharpe_opt_weights, conf_level, horizon_days,
+            rf_daily, annualization_factor, method=method
         )
-        es_sh = es_sh_df.loc[conf_level, "ES"]
 
-        plt.scatter([es_sh], [sharpe_sh],
-                    marker="D", s=120, color="green",
-                    label="Sharpe-optimal (sim)")
+        ax.scatter(es_sh, sharpe_sh,
+                   marker="D", s=120, color="green",
+                   label="Sharpe-optimal (sim)")
 
-    plt.xlabel(f"{cl_pct}% ES (expected tail loss)")
-    plt.ylabel("Annualized Sharpe ratio")
-    plt.title(f"Historical vs Simulated ES–Sharpe Frontier ({cl_pct}% ES)")
-    plt.grid(alpha=0.2)
-    plt.legend()
-    plt.tight_layout()
+    ax.set_xlabel(f"{cl_pct}% ES (expected tail loss)")
+    ax.set_ylabel("Annualized Sharpe ratio")
+    ax.set_title(f"Historical vs Simulated ES–Sharpe Frontier ({cl_pct}% ES)")
+    ax.grid(alpha=0.2)
+    ax.legend()
+    fig.tight_layout()
 
     if save_path is not None:
-        plt.savefig(save_path, dpi=300, bbox_inches="tight")
+        fig.savefig(save_path, dpi=300, bbox_inches="tight")
 
     plt.show()
-    plt.close()
+    plt.close(fig)
@@ -1,51 +1,339 @@
 # var_es.py
 
+import os
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
 import numpy as np
 import pandas as pd
+from scipy.stats import kurtosis, norm, skew
+
+from _jit import HAVE_NUMBA, get_num_threads, njit, prange, set_num_threads
+
+# Fewest portfolios (columns) worth handing to one worker thread
+PAR_MIN_COLS = 256
+
+# Portfolios per cache block in the historical tail pass
+TILE = 64
+
+# portfolio_var_es(..., return_type="tuple"): one entry per conf level
+VarES = namedtuple("VarES", ["VaR", "ES"])
+
+
+@njit(parallel=True, cache=True)
+def _var_es_batch_kernel(port_mat, ks_desc, order, scale, out):
+    """
+    Per-column VaR/ES of a (T, P) return matrix, columns in parallel.
+
+    ks_desc : tail sizes sorted from largest to smallest
+    order   : output row of each entry of ks_desc
+    out     : (len(ks), P, 2) array filled with [VaR, ES]
+    """
+    P = port_mat.shape[1]
+    for j in prange(P):
+        col = np.partition(port_mat[:, j], ks_desc[0] - 1)
+        for r in range(ks_desc.shape[0]):
+            k = ks_desc[r]
+            if r > 0:
+                # Smaller tail: only the previous prefix needs partitioning
+                col[:ks_desc[r - 1]] = np.partition(col[:ks_desc[r - 1]], k - 1)
+
+            s = 0.0
+            for m in range(k):
+                s += col[m]
+
+            out[order[r], j, 0] = -col[k - 1] * scale
+            out[order[r], j, 1] = -(s / k) * scale
 
 
 def portfolio_var_es(returns_df,
                      weights,
                      conf_levels=(0.95, 0.99),
-                     horizon_days=1):
+                     horizon_days=1,
+                     method="historical",
+                     return_type="dataframe"):
     """
-    Historical VaR & ES for a portfolio.
+    VaR & ES for a portfolio (historical by default).
 
-    returns_df : DataFrame of asset log-returns (columns = assets)
+    returns_df : DataFrame or (T, n_assets) ndarray of asset log-returns
+                 (columns = assets); an ndarray skips pandas entirely
     weights    : array-like, same length as number of columns
     conf_levels: iterable of confidence levels (e.g. [0.95, 0.99])
     horizon_days: holding period (scales results by sqrt(time))
+    method     : "historical" (empirical tail), "gaussian" (closed form
+                 from mean/std) or "cornish_fisher" (Gaussian adjusted for
+                 sample skewness and excess kurtosis)
+    return_type: "dataframe", "tuple" or "ndarray" (the last two skip the
+                 pandas constructors, for use in loops)
 
-    Returns: pandas DataFrame with rows = conf levels, columns = ['VaR', 'ES']
+    Returns: depending on return_type
+      "dataframe": pandas DataFrame with rows = conf levels,
+                   columns = ['VaR', 'ES']
+      "tuple"    : VarES(VaR, ES) namedtuple of arrays, one entry per
+                   conf level
+      "ndarray"  : array of shape (len(conf_levels), 2) = [VaR, ES]
     """
+    if return_type not in ("dataframe", "tuple", "ndarray"):
+        raise ValueError("return_type must be 'dataframe', 'tuple' or 'ndarray'")
+
     weights = np.array(weights, dtype=float)
     weights = weights / weights.sum()  # normalize
 
     # Portfolio returns
-    port_ret = returns_df.dot(weights).dropna().values
-    n = len(port_ret)
+    if isinstance(returns_df, np.ndarray):
+        port_ret = returns_df @ weights
+        port_ret = port_ret[~np.isnan(port_ret)]
+    else:
+        port_ret = returns_df.dot(weights).dropna().values
+
+    conf_levels = list(conf_levels)
+    var_es = _var_es_from_port_returns(port_ret, conf_levels, horizon_days,
+                                       method=method)
+
+    if return_type == "ndarray":
+        return var_es
+    if return_type == "tuple":
+        return VarES(var_es[:, 0], var_es[:, 1])
+
+    results = [
+        {"conf_level": cl, "VaR": var_value, "ES": es_value}
+        for cl, (var_value, es_value) in zip(conf_levels, var_es)
+    ]
+
+    return pd.DataFrame(results).set_index("conf_level")
+
+
+def _var_es_from_port_returns(port_ret, conf_levels, horizon_days=1,
+                              method="historical", n_jobs=None):
+    """
+    VaR & ES straight from portfolio returns (no pandas).
+
+    port_ret   : ndarray of portfolio returns, shape (T,) or (T, P) with one
+                 portfolio per column, no NaNs
+    conf_levels: iterable of confidence levels
+    horizon_days: holding period (scales results by sqrt(time))
+    method     : "historical", "gaussian" or "cornish_fisher"
+    n_jobs     : threads for the historical tail pass over columns
+                 (None = all cores, 1 = serial); with numba it also caps
+                 the kernel's threads
+
+    Returns: ndarray of shape (len(conf_levels), 2) or
+             (len(conf_levels), P, 2); [..., 0] = VaR and [..., 1] = ES
+             (positive numbers, as in portfolio_var_es)
+    """
+    if method != "historical":
+        return _parametric_from_port_returns(port_ret, conf_levels,
+                                             horizon_days, method)
+
+    # Threads for the numba kernel: its pool size, capped by n_jobs
+    numba_threads = get_num_threads()
+    n_threads = numba_threads
+    if n_jobs is not None:
+        n_threads = min(n_threads, max(1, n_jobs))
+
+    conf_levels = list(conf_levels)
+    n = port_ret.shape[0]
     scale = np.sqrt(horizon_days)
 
-    results = []
+    # tail prob alpha = 1 - cl (e.g. 0.05 for 95% VaR) -> k worst returns
+    tail_k = [max(1, int(np.floor((1 - cl) * n))) for cl in conf_levels]
+
+    out = np.empty((len(conf_levels),) + port_ret.shape[1:] + (2,))
+
+    # The column-parallel kernel only beats NumPy's axis-0 partition when
+    # it actually has several threads to spread the columns over
+    if HAVE_NUMBA and n_threads > 1 and port_ret.ndim == 2:
+        order = np.argsort(tail_k, kind="stable")[::-1].copy()
+        ks_desc = np.asarray(tail_k, dtype=np.int64)[order]
+        set_num_threads(n_threads)
+        try:
+            _var_es_batch_kernel(port_ret, ks_desc, order, scale, out)
+        finally:
+            set_num_threads(numba_threads)
+        return out
+
+    n_jobs = _n_jobs(n_jobs, port_ret)
+    if n_jobs == 1:
+        _historical_tail(port_ret, tail_k, scale, out)
+        return out
+
+    # Columns are independent portfolios: split them into contiguous
+    # blocks, one per thread (np.partition releases the GIL)
+    P = port_ret.shape[1]
+    bounds = [c * P // n_jobs for c in range(n_jobs + 1)]
+
+    def work(c):
+        cols = slice(bounds[c], bounds[c + 1])
+        _historical_tail(port_ret[:, cols], tail_k, scale, out[:, cols])
+
+    with ThreadPoolExecutor(n_jobs) as pool:
+        list(pool.map(work, range(n_jobs)))
+
+    return out
+
+
+def _n_jobs(n_jobs, port_ret):
+    # None -> one thread per core, capped so each gets PAR_MIN_COLS columns
+    if port_ret.ndim == 1:
+        return 1
+    if n_jobs is None:
+        n_jobs = os.cpu_count() or 1
+    return max(1, min(n_jobs, port_ret.shape[1] // PAR_MIN_COLS))
+
+
+def _historical_tail(port_ret, tail_k, scale, out):
+    """
+    Fill out[i, ..., :] with the historical [VaR, ES] of every column of
+    port_ret for tail size tail_k[i].
+
+    Columns are processed TILE at a time, each tile copied to a
+    (TILE x T) block with one portfolio per contiguous row: the partitions
+    then run in place on a working set that stays in L2 instead of
+    striding down the columns of the full (T x P) matrix.
+    """
+    if port_ret.ndim == 1:
+        _tail_block(port_ret.reshape(1, -1).copy(), tail_k, scale,
+                    out[:, None])
+        return
+
+    for j0 in range(0, port_ret.shape[1], TILE):
+        cols = slice(j0, j0 + TILE)
+        block = np.ascontiguousarray(port_ret[:, cols].T)
+        _tail_block(block, tail_k, scale, out[:, cols])
 
-    for cl in conf_levels:
-        alpha = 1 - cl  # tail prob (e.g. 0.05 for 95% VaR)
 
-        # Sort returns from worst to best
-        sorted_ret = np.sort(port_ret)
+def _tail_block(block, tail_k, scale, out):
+    # Largest tail first: a partition puts the k worst returns in
+    # tail[:, :k] (unordered) in O(T). Every smaller tail is a subset of
+    # it, so later levels only re-partition the previous tail.
+    tail = block
 
-        k = int(np.floor(alpha * n))
-        k = max(1, k)
+    for i in sorted(range(len(tail_k)), key=tail_k.__getitem__, reverse=True):
+        k = tail_k[i]
+        tail.partition(k - 1, axis=1)
+        tail = tail[:, :k]
 
-        # VaR: quantile of loss, as positive number
-        var_ret = sorted_ret[k - 1]
-        var_value = -var_ret * scale
+        # VaR: quantile of loss, as positive number (tail[:, k - 1] is its max)
+        out[i, :, 0] = -tail[:, k - 1] * scale
 
         # ES: mean of worst alpha% returns, also positive
-        tail = sorted_ret[:k]
-        es_ret = tail.mean()
-        es_value = -es_ret * scale
+        out[i, :, 1] = -tail.mean(axis=1, dtype=np.float64) * scale
 
-        results.append({"conf_level": cl, "VaR": var_value, "ES": es_value})
 
-    return pd.DataFrame(results).set_index("conf_level")
+def portfolio_var_es_gaussian(mu, sigma, conf_levels=(0.95, 0.99),
+                              horizon_days=1):
+    """
+    Gaussian VaR & ES from the mean and std of portfolio returns.
+
+    mu, sigma  : scalars or arrays (one entry per portfolio) of daily mean
+                 and standard deviation
+    conf_levels: iterable of confidence levels
+    horizon_days: holding period (scales results by sqrt(time))
+
+    With alpha = 1 - cl and z = Phi^-1(alpha):
+        VaR = -mu - z * sigma
+        ES  = -mu + sigma * phi(z) / alpha
+
+    Returns: ndarray of shape (len(conf_levels), *mu.shape, 2), laid out as
+             in _var_es_from_port_returns
+    """
+    return portfolio_var_es_cornish_fisher(mu, sigma, 0.0, 0.0,
+                                           conf_levels, horizon_days)
+
+
+def portfolio_var_es_cornish_fisher(mu, sigma, skewness, excess_kurt,
+                                    conf_levels=(0.95, 0.99),
+                                    horizon_days=1):
+    """
+    Cornish–Fisher VaR & ES: the Gaussian quantile corrected for skewness S
+    and excess kurtosis K,
+
+        z_cf = z + (z^2 - 1) S/6 + (z^3 - 3z) K/24 - (2z^3 - 5z) S^2/36
+
+    ES averages z_cf over the tail u < alpha. z_cf is a cubic in z, so the
+    average only needs the truncated normal moments E[Z^n ; Z < z] and stays
+    closed form. S = K = 0 gives portfolio_var_es_gaussian.
+
+    mu, sigma, skewness, excess_kurt : scalars or broadcastable arrays
+    """
+    mu, sigma, S, K = np.broadcast_arrays(
+        *(np.asarray(x, dtype=float) for x in (mu, sigma, skewness, excess_kurt))
+    )
+    alpha = 1 - np.asarray(list(conf_levels), dtype=float)
+    scale = np.sqrt(horizon_days)
+
+    # Per confidence level, broadcast against the portfolio axes
+    alpha = alpha.reshape((-1,) + (1,) * mu.ndim)
+    z = norm.ppf(alpha)
+    pdf = norm.pdf(z)
+
+    z_cf = (z + (z**2 - 1) * S / 6 + (z**3 - 3 * z) * K / 24
+            - (2 * z**3 - 5 * z) * S**2 / 36)
+
+    # Tail moments M_n = E[Z^n ; Z < z] of the standard normal
+    m1 = -pdf
+    m2 = alpha - z * pdf
+    m3 = -(z**2 + 2) * pdf
+    tail_z_cf = (m1 + (m2 - alpha) * S / 6 + (m3 - 3 * m1) * K / 24
+                 - (2 * m3 - 5 * m1) * S**2 / 36) / alpha
+
+    out = np.empty(z_cf.shape + (2,))
+    out[..., 0] = -(mu + sigma * z_cf) * scale
+    out[..., 1] = -(mu + sigma * tail_z_cf) * scale
+    return out
+
+
+def _parametric_from_port_returns(port_ret, conf_levels, horizon_days,
+                                  method):
+    # Sample moments along time, then the closed form per portfolio
+    mu = port_ret.mean(axis=0, dtype=np.float64)
+    sigma = port_ret.std(axis=0, ddof=1, dtype=np.float64)
+
+    if method == "gaussian":
+        return portfolio_var_es_gaussian(mu, sigma, conf_levels, horizon_days)
+    if method == "cornish_fisher":
+        return portfolio_var_es_cornish_fisher(
+            mu, sigma, skew(port_ret, axis=0), kurtosis(port_ret, axis=0),
+            conf_levels, horizon_days
+        )
+    raise ValueError(
+        "method must be 'historical', 'gaussian' or 'cornish_fisher'"
+    )
+
+
+def portfolio_var_es_batch(R, W_all, conf_levels=(0.95, 0.99), horizon_days=1,
+                           method="historical", n_jobs=None,
+                           dtype=np.float64, port_buf=None):
+    """
+    VaR & ES for many portfolios at once (historical by default).
+
+    R          : ndarray of asset log-returns, shape (T, n_assets), no NaNs
+    W_all      : ndarray of weights, shape (n_assets, P), one portfolio per
+                 column (each column is normalized to sum to 1)
+    conf_levels: iterable of confidence levels (e.g. [0.95, 0.99])
+    horizon_days: holding period (scales results by sqrt(time))
+    method     : "historical", "gaussian" or "cornish_fisher"
+    n_jobs     : threads for the historical tail pass (None = all cores,
+                 1 = serial, also for the numba kernel)
+    dtype      : precision of the GEMM and tail pass; float32 halves the
+                 (T x P) matrix the tail pass streams through (statistics
+                 are still accumulated in float64)
+    port_buf   : optional C-contiguous buffer of that dtype and shape
+                 (>= T, P) that receives the portfolio returns, so several
+                 calls can share one allocation
+
+    Returns: ndarray of shape (len(conf_levels), P, 2) with VaR in [..., 0]
+             and ES in [..., 1]; matches portfolio_var_es column by column
+    """
+    W_all = np.asarray(W_all, dtype=float)
+    W_all = W_all / W_all.sum(axis=0)  # normalize
+
+    # One GEMM for all portfolios instead of P separate dot products;
+    # C-contiguous operands so float32 runs as BLAS sgemm
+    R = np.ascontiguousarray(R, dtype=dtype)
+    W_all = np.ascontiguousarray(W_all, dtype=dtype)
+    out = None if port_buf is None else port_buf[:R.shape[0]]
+    port_ret = np.matmul(R, W_all, out=out)
+
+    return _var_es_from_port_returns(port_ret, conf_levels, horizon_days,
+                                     method=method, n_jobs=n_jobs)